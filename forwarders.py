@@ -1,13 +1,75 @@
 import os
+import asyncio
+import json
 import logging
 import aiohttp
 import time
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# 请求失败时记录的响应内容最大字节数
+ERROR_BODY_LIMIT = 2048
+
+# 请求遇到可重试错误（5xx、建立连接失败）时的最大尝试次数（含首次请求）
+HTTP_MAX_ATTEMPTS = 3
+
+
+class TransientHTTPError(Exception):
+    """可重试的 HTTP 错误（服务端 5xx）"""
+
+    def __init__(self, status: int, text: str):
+        super().__init__(f"状态码: {status}, 响应: {text}")
+        self.status = status
+
+
+# 可重试的请求错误：仅限请求确定未被处理的情况
+# 超时或响应中途断开时，平台可能已经收到消息，重试会导致重复发送
+RETRYABLE_ERRORS = (aiohttp.ClientConnectorError, TransientHTTPError)
+
+# 所有请求错误，重试耗尽或不可重试时记录日志并返回失败
+REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, TransientHTTPError)
+
+
+def json_dumps(data: Dict) -> bytes:
+    """序列化为 JSON 字节串，优先使用 orjson"""
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def json_loads(data: bytes):
+    """解析 JSON 字节串，优先使用 orjson"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def create_session() -> aiohttp.ClientSession:
+    """
+    创建所有转发器共享的 HTTP 会话，复用 keep-alive 连接
+    同一主机的 token 获取与消息发送共用连接池，后续请求无需重新握手
+    需要在事件循环启动后调用
+    """
+    connector = aiohttp.TCPConnector(
+        limit=int(os.getenv('HTTP_POOL_SIZE', '100')),
+        limit_per_host=int(os.getenv('HTTP_POOL_SIZE_PER_HOST', '20')),
+        ttl_dns_cache=300,
+        keepalive_timeout=int(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '60'))
+    )
+    timeout = aiohttp.ClientTimeout(total=10)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
 
 class ForwarderType(Enum):
     """转发器类型"""
@@ -20,6 +82,17 @@ class ForwarderType(Enum):
 class BaseForwarder(ABC):
     """转发器基类"""
 
+    # 共享的 HTTP 会话，由 TelegramForwarder.start() 注入
+    session: Optional[aiohttp.ClientSession] = None
+
+    # 默认请求头
+    DEFAULT_HEADERS = {'Content-Type': 'application/json'}
+
+    @property
+    def is_deferred(self) -> bool:
+        """send() 返回 True 时是否仅表示已加入队列，实际发送结果由转发器自行记录"""
+        return False
+
     @abstractmethod
     async def send(self, content: Dict) -> bool:
         """
@@ -29,33 +102,267 @@ class BaseForwarder(ABC):
         """
         pass
 
-    async def _post_json(self, url: str, data: Dict, headers: Optional[Dict] = None) -> bool:
-        """发送 POST 请求"""
+    async def warmup(self):
+        """启动时的预热操作（如预先获取 token），在事件循环启动且注入 session 后调用"""
+        pass
+
+    async def close(self):
+        """停止转发器的后台任务，在关闭 session 前调用"""
+        pass
+
+    @staticmethod
+    async def _cancel_task(task: Optional[asyncio.Task]):
+        """取消后台任务并等待其结束"""
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    @staticmethod
+    def _retrying(url: str) -> AsyncRetrying:
+        """创建请求重试器：可重试错误时按指数退避重试，重试耗尽后抛出最后一次的异常"""
+        host = urlsplit(url).hostname
+
+        def log_retry(retry_state):
+            error = retry_state.outcome.exception()
+            logger.warning(
+                f"请求 {host} 失败，准备第 {retry_state.attempt_number} 次重试: {error!r}",
+                extra={'host': host, 'status': getattr(error, 'status', None),
+                       'retry_count': retry_state.attempt_number}
+            )
+
+        return AsyncRetrying(
+            stop=stop_after_attempt(HTTP_MAX_ATTEMPTS),
+            wait=wait_exponential_jitter(initial=1, max=10),
+            retry=retry_if_exception_type(RETRYABLE_ERRORS),
+            before_sleep=log_retry,
+            reraise=True
+        )
+
+    async def _post_with_retry(self, url: str, data: bytes, headers: Optional[Dict] = None,
+                               read_body: bool = False) -> Optional[Tuple[int, bytes]]:
+        """
+        发送 POST 请求，服务端 5xx 和建立连接失败会自动重试，超时不重试以免重复发送，非 200 响应会记录错误日志
+        :param data: 已序列化的 JSON 字节串
+        :param headers: 完整的请求头（需已包含 Content-Type），默认使用 DEFAULT_HEADERS
+        :param read_body: 成功时是否读取响应内容；失败时只读取前 ERROR_BODY_LIMIT 字节
+        :return: (状态码, 响应内容)，重试耗尽时返回 None
+        """
+        retry_count = 0
+        try:
+            async for attempt in self._retrying(url):
+                with attempt:
+                    retry_count = attempt.retry_state.attempt_number - 1
+                    async with self.session.post(url, data=data, headers=headers or self.DEFAULT_HEADERS) as resp:
+                        if resp.status == 200:
+                            return resp.status, await resp.read() if read_body else b''
+
+                        # 失败时只读取部分响应内容，避免大量失败请求时浪费带宽和内存
+                        text = (await resp.content.read(ERROR_BODY_LIMIT)).decode('utf-8', 'replace')
+                        if resp.status >= 500:
+                            raise TransientHTTPError(resp.status, text)
+
+                        logger.error(
+                            f"请求失败，状态码: {resp.status}, 响应: {text}",
+                            extra={'host': resp.url.host, 'status': resp.status, 'retry_count': retry_count}
+                        )
+                        return resp.status, b''
+        except REQUEST_ERRORS as e:
+            logger.error(
+                f"请求失败，已重试 {retry_count} 次: {e!r}",
+                extra={'host': urlsplit(url).hostname, 'status': getattr(e, 'status', None),
+                       'retry_count': retry_count}
+            )
+            return None
+
+    async def _post_json(self, url: str, data: Union[Dict, bytes], headers: Optional[Dict] = None) -> bool:
+        """
+        发送 POST 请求
+        :param data: 请求数据字典，或已序列化的 JSON 字节串
+        :param headers: 完整的请求头（需已包含 Content-Type），默认使用 DEFAULT_HEADERS
+        """
+        if not isinstance(data, bytes):
+            data = json_dumps(data)
+
+        # 仅在调试日志开启时读取响应内容
+        debug = logger.isEnabledFor(logging.DEBUG)
+        response = await self._post_with_retry(url, data, headers, read_body=debug)
+        if not response or response[0] != 200:
+            return False
+
+        if debug:
+            logger.debug(f"发送成功: {response[1].decode('utf-8', 'replace')}")
+        return True
+
+
+class BatchingForwarder(BaseForwarder):
+    """
+    批量转发器基类
+    在短时间窗口内收集消息，按对话合并后一次性发送，减少消息洪峰时的请求数
+    """
+
+    # 合并消息中单条消息的格式
+    ITEM_TEMPLATE = "消息: {message}\n发送者: {sender}"
+
+    # 合并后消息内容的最大 UTF-8 字节数，由子类按平台限制设置
+    MAX_CONTENT_BYTES = 4096
+
+    def __init__(self):
+        # 合并窗口（毫秒），设置为 0 则关闭合并，逐条发送
+        self._dispatch_interval = int(os.getenv('BATCH_INTERVAL_MS', '100')) / 1000
+        # 单次合并的最大消息数（内容长度另受 MAX_CONTENT_BYTES 限制）
+        self._max_batch_size = max(1, int(os.getenv('BATCH_MAX_SIZE', '20')))
+
+        # 待合并消息队列，队列满时丢弃新消息，避免 webhook 缓慢时内存无限增长
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=int(os.getenv('BATCH_QUEUE_SIZE', '1000')))
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    def _build_data(self, message: str) -> Dict:
+        """
+        构建请求数据
+        :param message: 合并后的消息文本
+        :return: 请求数据字典
+        """
+        pass
+
+    @abstractmethod
+    def _get_url(self) -> str:
+        """获取请求地址"""
+        pass
+
+    @abstractmethod
+    def _check_result(self, result: Dict) -> Optional[str]:
+        """
+        检查平台返回结果
+        :param result: 响应内容
+        :return: 错误信息，成功时返回 None
+        """
+        pass
+
+    async def send(self, content: Dict) -> bool:
+        if self._dispatch_interval <= 0:
+            return await self._send_batch([content])
+
+        # 首次发送时启动后台合并任务（此时事件循环已运行）
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+        # 加入队列后立即返回，发送结果由后台任务记录
         try:
-            default_headers = {'Content-Type': 'application/json'}
-            if headers:
-                default_headers.update(headers)
-
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, json=data, headers=default_headers) as resp:
-                    if resp.status == 200:
-                        result = await resp.json()
-                        logger.debug(f"发送成功: {result}")
-                        return True
-                    else:
-                        text = await resp.text()
-                        logger.error(f"发送失败，状态码: {resp.status}, 响应: {text}")
-                        return False
-        except Exception as e:
-            logger.error(f"发送请求时出错: {e}")
+            self._queue.put_nowait(content)
+        except asyncio.QueueFull:
+            logger.warning(f"合并队列已满，丢弃消息 - [{content['chat_title']}] {content['sender']}")
+            return False
+        return True
+
+    @property
+    def is_deferred(self) -> bool:
+        return self._dispatch_interval > 0
+
+    async def close(self):
+        pending = self._queue.qsize()
+        if pending:
+            logger.warning(f"合并队列中还有 {pending} 条消息未发送，将被丢弃")
+        await self._cancel_task(self._flush_task)
+        self._flush_task = None
+
+    async def _flush_loop(self):
+        """
+        后台合并任务：收到消息后等待一个合并窗口，再取出队列中的消息批量发送
+        合并内容超过 MAX_CONTENT_BYTES 时，超出的消息留到下一批发送
+        """
+        carry = None
+        while True:
+            if carry is None:
+                first = await self._queue.get()
+                await asyncio.sleep(self._dispatch_interval)
+            else:
+                # 上一批放不下的消息，队列中已有积压，无需再等待
+                first, carry = carry, None
+
+            groups: Dict[str, List[str]] = {}
+            size = self._add_to_groups(groups, first, 0)
+            count = 1
+            while count < self._max_batch_size and not self._queue.empty():
+                content = self._queue.get_nowait()
+                new_size = self._add_to_groups(groups, content, size, self.MAX_CONTENT_BYTES)
+                if new_size is None:
+                    carry = content
+                    break
+                size = new_size
+                count += 1
+
+            try:
+                if await self._send_groups(groups):
+                    logger.info(f"消息已转发 - 共 {count} 条，对话: {', '.join(groups)}")
+                else:
+                    logger.error(f"批量消息转发失败，共 {count} 条，对话: {', '.join(groups)}")
+            except Exception as e:
+                logger.error(f"批量发送消息时出错: {e}")
+
+    def _add_to_groups(self, groups: Dict[str, List[str]], content: Dict, size: int,
+                       limit: Optional[int] = None) -> Optional[int]:
+        """
+        将消息加入按对话分组的合并内容
+        :param size: 当前合并内容的 UTF-8 字节数
+        :param limit: 字节数上限，加入后超出上限则不加入
+        :return: 加入后的字节数，超出上限时返回 None
+        """
+        chat_title = content['chat_title']
+        item = self.ITEM_TEMPLATE.format_map(content)
+        # 每条消息前有一个换行，与对话标题或上一条消息分隔
+        new_size = size + len(item.encode('utf-8')) + 1
+        if chat_title not in groups:
+            # 新对话：标题，与上一个对话之间空一行
+            new_size += len(f"**{chat_title}**".encode('utf-8')) + (2 if groups else 0)
+
+        if limit is not None and new_size > limit:
+            return None
+
+        groups.setdefault(chat_title, []).append(item)
+        return new_size
+
+    async def _send_batch(self, contents: List[Dict]) -> bool:
+        """按对话分组合并消息并发送"""
+        groups: Dict[str, List[str]] = {}
+        size = 0
+        for content in contents:
+            size = self._add_to_groups(groups, content, size)
+        return await self._send_groups(groups)
+
+    async def _send_groups(self, groups: Dict[str, List[str]]) -> bool:
+        """发送按对话分组的合并消息，并检查平台返回的错误码"""
+        message = "\n\n".join(
+            f"**{chat_title}**\n" + "\n".join(items) for chat_title, items in groups.items()
+        )
+
+        response = await self._post_with_retry(self._get_url(), json_dumps(self._build_data(message)), read_body=True)
+        if not response or response[0] != 200:
+            return False
+
+        # 平台在 HTTP 200 响应中通过错误码返回失败（如内容超长）
+        result = json_loads(response[1])
+        error = self._check_result(result)
+        if error:
+            logger.error(f"发送失败: {error}")
             return False
 
+        logger.debug(f"发送成功: {result}")
+        return True
 
-class WeComForwarder(BaseForwarder):
+
+class WeComForwarder(BatchingForwarder):
     """企业微信群机器人转发器"""
 
+    # markdown 内容最长 4096 字节
+    MAX_CONTENT_BYTES = 4096
+
     def __init__(self):
+        super().__init__()
         self.webhook_url = os.getenv('WECOM_WEBHOOK_URL')
         if not self.webhook_url:
             logger.error("未配置 WECOM_WEBHOOK_URL")
@@ -63,60 +370,90 @@ class WeComForwarder(BaseForwarder):
     async def send(self, content: Dict) -> bool:
         if not self.webhook_url:
             return False
+        return await super().send(content)
 
-        # 构建企业微信消息格式
-        message = f"**{content['chat_title']}**\n"
-        message += f"消息: {content['message']}\n"
-        message += f"发送者: {content['sender']}"
+    def _get_url(self) -> str:
+        return self.webhook_url
 
-        data = {
+    def _build_data(self, message: str) -> Dict:
+        # 构建企业微信消息格式
+        return {
             "msgtype": "markdown",
             "markdown": {
                 "content": message
             }
         }
 
-        return await self._post_json(self.webhook_url, data)
+    def _check_result(self, result: Dict) -> Optional[str]:
+        if result.get('errcode') != 0:
+            return f"{result.get('errcode')} {result.get('errmsg')}"
+        return None
 
 
 class WeComAppForwarder(BaseForwarder):
     """企业微信应用转发器"""
 
+    MESSAGE_TEMPLATE = "{chat_title}\n消息: {message}\n发送者: {sender}"
+
     def __init__(self):
         self.corpid = os.getenv('WECOM_CORPID')
         self.corpsecret = os.getenv('WECOM_CORPSECRET')
-        self.agentid = os.getenv('WECOM_AGENTID')
+        self.agentid = self._parse_agentid(os.getenv('WECOM_AGENTID'))
         self.touser = os.getenv('WECOM_TOUSER', '@all')  # 默认发送给所有人
 
-        # Access token 缓存
+        # 请求数据中不变的部分，发送时只需填入消息内容
+        self._data_template = {
+            "touser": self.touser,
+            "msgtype": "text",
+            "agentid": self.agentid,
+            "safe": 0,
+            "enable_id_trans": 0,
+            "enable_duplicate_check": 0
+        }
+
+        # Access token 缓存，由后台任务 _token_refresher 提前刷新
         self._access_token = None
         self._token_expires_at = 0
+        self._token_lock = asyncio.Lock()
+        self._token_invalid = asyncio.Event()
+        self._refresher_task: Optional[asyncio.Task] = None
 
         if not all([self.corpid, self.corpsecret, self.agentid]):
             logger.error("未配置完整的企业微信应用参数 (WECOM_CORPID, WECOM_CORPSECRET, WECOM_AGENTID)")
 
-    async def _get_access_token(self) -> Optional[str]:
-        """获取 access_token，带缓存机制"""
-        # 如果 token 还有效（提前 5 分钟刷新），直接返回缓存
-        if self._access_token and time.time() < self._token_expires_at - 300:
-            return self._access_token
-
-        # 获取新 token
+    @staticmethod
+    def _parse_agentid(value: Optional[str]) -> Optional[int]:
+        """解析 WECOM_AGENTID，非数字时记录错误并视为未配置"""
+        if not value:
+            return None
         try:
-            url = f"https://qyapi.weixin.qq.com/cgi-bin/gettoken"
-            params = {
-                'corpid': self.corpid,
-                'corpsecret': self.corpsecret
-            }
+            return int(value)
+        except ValueError:
+            logger.error(f"WECOM_AGENTID 必须为数字: {value}")
+            return None
 
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url, params=params) as resp:
+    async def _fetch_token(self, force: bool = True) -> Optional[str]:
+        """
+        从企业微信获取新的 access_token 并更新缓存
+        :param force: 为 False 时若已有缓存 token 则直接返回，避免并发重复请求
+        """
+        async with self._token_lock:
+            if not force and self._access_token:
+                return self._access_token
+
+            try:
+                url = f"https://qyapi.weixin.qq.com/cgi-bin/gettoken"
+                params = {
+                    'corpid': self.corpid,
+                    'corpsecret': self.corpsecret
+                }
+
+                async with self.session.get(url, params=params) as resp:
                     if resp.status != 200:
                         logger.error(f"获取 access_token 失败，状态码: {resp.status}")
                         return None
 
-                    data = await resp.json()
+                    data = json_loads(await resp.read())
                     if data.get('errcode') != 0:
                         logger.error(f"获取 access_token 失败: {data.get('errmsg')}")
                         return None
@@ -128,67 +465,78 @@ class WeComAppForwarder(BaseForwarder):
                         f"成功获取 access_token，有效期至: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self._token_expires_at))}")
                     return self._access_token
 
-        except Exception as e:
-            logger.error(f"获取 access_token 时出错: {e}")
-            return None
+            except Exception as e:
+                logger.error(f"获取 access_token 时出错: {e}")
+                return None
+
+    async def warmup(self):
+        """预先获取 access_token 并启动后台刷新任务，避免首条消息等待 token 请求"""
+        if not all([self.corpid, self.corpsecret, self.agentid]):
+            return
+
+        await self._fetch_token()
+        if self._refresher_task is None:
+            self._refresher_task = asyncio.create_task(self._token_refresher())
+
+    async def close(self):
+        await self._cancel_task(self._refresher_task)
+        self._refresher_task = None
+
+    async def _token_refresher(self):
+        """后台刷新 access_token：过期前 10 分钟刷新，token 失效时立即刷新"""
+        while True:
+            delay = max(60, self._token_expires_at - time.time() - 600)
+            try:
+                await asyncio.wait_for(self._token_invalid.wait(), timeout=delay)
+                invalidated = True
+            except asyncio.TimeoutError:
+                invalidated = False
+            self._token_invalid.clear()
+            # token 失效时缓存已被清除，若发送方已重新获取则无需再次请求；定时刷新则强制获取
+            await self._fetch_token(force=not invalidated)
 
     async def send(self, content: Dict) -> bool:
         if not all([self.corpid, self.corpsecret, self.agentid]):
             return False
 
-        # 获取 access_token
-        access_token = await self._get_access_token()
+        # 获取 access_token（通常已由后台任务准备好，仅在尚未获取时同步请求）
+        access_token = self._access_token or await self._fetch_token(force=False)
         if not access_token:
             return False
 
         # 构建消息内容
-        message_text = f"{content['chat_title']}\n"
-        message_text += f"消息: {content['message']}\n"
-        message_text += f"发送者: {content['sender']}"
+        message_text = self.MESSAGE_TEMPLATE.format_map(content)
 
         # 构建发送消息的请求
         url = f"https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={access_token}"
-        data = {
-            "touser": self.touser,
-            "msgtype": "text",
-            "agentid": int(self.agentid),
-            "text": {
-                "content": message_text
-            },
-            "safe": 0,
-            "enable_id_trans": 0,
-            "enable_duplicate_check": 0
-        }
+        data = {**self._data_template, "text": {"content": message_text}}
 
-        try:
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, json=data) as resp:
-                    if resp.status != 200:
-                        logger.error(f"发送消息失败，状态码: {resp.status}")
-                        return False
-
-                    result = await resp.json()
-                    if result.get('errcode') != 0:
-                        logger.error(f"发送消息失败: {result.get('errmsg')}")
-                        # 如果是 token 过期，清除缓存
-                        if result.get('errcode') in [40014, 42001]:
-                            self._access_token = None
-                            self._token_expires_at = 0
-                        return False
-
-                    logger.debug(f"消息发送成功: {result}")
-                    return True
-
-        except Exception as e:
-            logger.error(f"发送消息时出错: {e}")
+        response = await self._post_with_retry(url, json_dumps(data), read_body=True)
+        if not response or response[0] != 200:
             return False
 
+        result = json_loads(response[1])
+        if result.get('errcode') != 0:
+            logger.error(f"发送消息失败: {result.get('errmsg')}")
+            # 如果是 token 过期，清除缓存并通知后台任务立即刷新
+            if result.get('errcode') in [40014, 42001]:
+                self._access_token = None
+                self._token_expires_at = 0
+                self._token_invalid.set()
+            return False
 
-class FeishuForwarder(BaseForwarder):
+        logger.debug(f"消息发送成功: {result}")
+        return True
+
+
+class FeishuForwarder(BatchingForwarder):
     """飞书机器人转发器"""
 
+    # 请求体最大 20 KB，预留 JSON 结构与转义所需的空间
+    MAX_CONTENT_BYTES = 18 * 1024
+
     def __init__(self):
+        super().__init__()
         self.webhook_url = os.getenv('FEISHU_WEBHOOK_URL')
         if not self.webhook_url:
             logger.error("未配置 FEISHU_WEBHOOK_URL")
@@ -196,20 +544,26 @@ class FeishuForwarder(BaseForwarder):
     async def send(self, content: Dict) -> bool:
         if not self.webhook_url:
             return False
+        return await super().send(content)
 
-        # 构建飞书消息格式
-        message = f"**{content['chat_title']}**\n"
-        message += f"消息: {content['message']}\n"
-        message += f"发送者: {content['sender']}"
+    def _get_url(self) -> str:
+        return self.webhook_url
 
-        data = {
+    def _build_data(self, message: str) -> Dict:
+        # 构建飞书消息格式
+        return {
             "msg_type": "text",
             "content": {
                 "text": message
             }
         }
 
-        return await self._post_json(self.webhook_url, data)
+    def _check_result(self, result: Dict) -> Optional[str]:
+        # 新版接口返回 code，旧版返回 StatusCode
+        code = result.get('code', result.get('StatusCode', 0))
+        if code != 0:
+            return f"{code} {result.get('msg', result.get('StatusMessage'))}"
+        return None
 
 
 class CustomForwarder(BaseForwarder):
@@ -218,7 +572,8 @@ class CustomForwarder(BaseForwarder):
     def __init__(self):
         self.api_url = os.getenv('CUSTOM_API_URL')
         self.api_method = os.getenv('CUSTOM_API_METHOD', 'POST').upper()
-        self.api_headers = self._parse_headers(os.getenv('CUSTOM_API_HEADERS', ''))
+        # 合并默认请求头与自定义请求头，避免每次发送重复合并
+        self.api_headers = self.DEFAULT_HEADERS | self._parse_headers(os.getenv('CUSTOM_API_HEADERS', ''))
 
         if not self.api_url:
             logger.error("未配置 CUSTOM_API_URL")
@@ -239,13 +594,13 @@ class CustomForwarder(BaseForwarder):
             return False
 
         # 直接发送原始内容，由用户自定义处理
-        data = {
+        data = json_dumps({
             "chat_title": content['chat_title'],
             "sender": content['sender'],
             "message": content['message'],
             "chat_id": content['chat_id'],
             "message_id": content['message_id']
-        }
+        })
 
         return await self._post_json(self.api_url, data, self.api_headers)
 
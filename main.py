@@ -3,13 +3,22 @@ import logging
 import os
 import sys
 import time
-from datetime import datetime, timezone
+from datetime import datetime
+from typing import Optional
+
+from cachetools import LRUCache, TTLCache
 
 from telethon import TelegramClient, events, functions, types
 from telethon.tl.types import Channel, Chat, User, MessageService
 from dotenv import load_dotenv
 
-from forwarders import ForwarderFactory
+from forwarders import ForwarderFactory, create_session
+
+# 使用 uvloop 替换默认事件循环（不支持的平台如 Windows 自动回退）
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 # 加载环境变量
 load_dotenv()
@@ -23,6 +32,16 @@ logger = logging.getLogger(__name__)
 
 PERMANENT_MUTE = 2 ** 31 - 1
 
+# 免打扰状态缓存时间（秒）
+MUTE_CACHE_TTL = 300
+PERMANENT_MUTE_CACHE_TTL = 3600
+# 免打扰状态 / 输入实体缓存大小
+MUTE_CACHE_SIZE = 10000
+
+# 对话实体 / 对话标题 / 发送者名称缓存大小与有效期（秒），过期后重新获取以反映改名
+NAME_CACHE_SIZE = 10000
+NAME_CACHE_TTL = 3600
+
 
 class TelegramForwarder:
     """Telegram 消息转发器"""
@@ -34,13 +53,26 @@ class TelegramForwarder:
         self.phone = os.getenv('TELEGRAM_PHONE')
 
         # 转发配置
-        forwarder_type = os.getenv('FORWARDER_TYPE', 'wecom').lower()
-        self.forwarder = ForwarderFactory.create(forwarder_type)
+        # 支持逗号分隔配置多个转发器，消息会同时转发到所有目标
+        self.forwarder_types = self._parse_list(os.getenv('FORWARDER_TYPE', 'wecom').lower())
+        self.forwarders = [ForwarderFactory.create(forwarder_type) for forwarder_type in self.forwarder_types]
 
         # 过滤配置
         self.filter_muted = os.getenv('FILTER_MUTED', 'true').lower() == 'true'
         self.whitelist_chats = self._parse_list(os.getenv('WHITELIST_CHATS', ''))
         self.blacklist_chats = self._parse_list(os.getenv('BLACKLIST_CHATS', ''))
+        self._whitelist_ids, self._whitelist_names = self._parse_chat_filter(self.whitelist_chats)
+        self._blacklist_ids, self._blacklist_names = self._parse_chat_filter(self.blacklist_chats)
+
+        # 免打扰状态缓存: chat_id -> (过期时间戳, 是否免打扰)，条目自带过期时间，超出容量时淘汰最久未用的
+        self._mute_cache: LRUCache = LRUCache(maxsize=MUTE_CACHE_SIZE)
+        # 输入实体缓存: chat_id -> InputPeer
+        self._input_peer_cache: LRUCache = LRUCache(maxsize=MUTE_CACHE_SIZE)
+        # 对话实体缓存: chat_id -> Chat/Channel/User
+        self._chat_entity_cache: TTLCache = TTLCache(maxsize=NAME_CACHE_SIZE, ttl=NAME_CACHE_TTL)
+        # 对话标题缓存: chat_id -> 标题；发送者名称缓存: sender_id -> 名称
+        self._chat_title_cache: TTLCache = TTLCache(maxsize=NAME_CACHE_SIZE, ttl=NAME_CACHE_TTL)
+        self._sender_name_cache: TTLCache = TTLCache(maxsize=NAME_CACHE_SIZE, ttl=NAME_CACHE_TTL)
 
         # 验证配置
         self._validate_config()
@@ -48,7 +80,19 @@ class TelegramForwarder:
         # 创建客户端
         self.client = TelegramClient('sessions/forwarder_session', self.api_id, self.api_hash)
 
-        logger.info(f"初始化完成，转发器类型: {forwarder_type}")
+        # 限制同时处理的消息数，避免消息洪峰时任务无限增长
+        self._handler_semaphore = asyncio.Semaphore(int(os.getenv('MAX_CONCURRENT_HANDLERS', '32')))
+
+        # 共享的 HTTP 会话，在 start() 中创建
+        self.session = None
+        # 发送队列与后台发送任务数
+        self._send_queue: asyncio.Queue = asyncio.Queue(maxsize=int(os.getenv('SEND_QUEUE_SIZE', '10000')))
+        self._send_workers = int(os.getenv('SEND_WORKERS', '4'))
+
+        # 后台任务，保留引用避免被垃圾回收
+        self._background_tasks = []
+
+        logger.info(f"初始化完成，转发器类型: {', '.join(self.forwarder_types)}")
 
     def _validate_config(self):
         """验证必要配置"""
@@ -56,7 +100,7 @@ class TelegramForwarder:
             logger.error("缺少必要的 Telegram 配置")
             sys.exit(1)
 
-        if not self.forwarder:
+        if not self.forwarders or not all(self.forwarders):
             logger.error("转发器初始化失败")
             sys.exit(1)
 
@@ -67,8 +111,58 @@ class TelegramForwarder:
             return []
         return [item.strip() for item in value.split(',') if item.strip()]
 
+    @staticmethod
+    def _parse_chat_filter(items: list) -> tuple[frozenset[int], frozenset[str]]:
+        """
+        将黑白名单拆分为 chat_id 集合与用户名集合
+        :return: (chat_id 集合, 小写且去掉 @ 的用户名集合)
+        """
+        chat_ids = set()
+        usernames = set()
+        for item in items:
+            # 以 + 开头的会被当作手机号查找，不支持
+            if item.startswith('+'):
+                logger.warning(f"不支持使用手机号配置黑白名单，已忽略: {item}")
+                continue
+            try:
+                chat_ids.add(int(item))
+            except ValueError:
+                usernames.add(item.lstrip('@').lower())
+        return frozenset(chat_ids), frozenset(usernames)
+
+    async def _resolve_usernames(self, usernames: frozenset) -> frozenset[int]:
+        """将黑白名单中的用户名解析为 chat_id，登录后调用"""
+        chat_ids = set()
+        for username in usernames:
+            try:
+                chat_ids.add(await self.client.get_peer_id(username))
+            except Exception as e:
+                logger.error(f"无法解析对话用户名 @{username}，该条名单配置不生效: {e}")
+        return frozenset(chat_ids)
+
+    @staticmethod
+    def _to_epoch(mute_until) -> int:
+        """将 mute_until 统一转换为时间戳，0 表示不免打扰"""
+        # 兼容 datetime / int 两种情况
+        if not mute_until:
+            return 0
+        if isinstance(mute_until, datetime):
+            return int(mute_until.timestamp())
+        if isinstance(mute_until, int):
+            return mute_until
+        # 兜底使用免打扰策略
+        return PERMANENT_MUTE
+
     async def is_chat_muted(self, event) -> bool:
         """检查当前消息所属对话是否处于免打扰状态"""
+        chat_id = event.chat_id
+        now = int(time.time())
+
+        # 命中缓存且未过期，直接返回
+        cached = self._mute_cache.get(chat_id)
+        if cached and cached[0] > now:
+            return cached[1]
+
         try:
             # peer = event.message.peer_id  # Or event.chat for the entity
             # input_peer = await self.client.get_input_entity(peer)
@@ -82,42 +176,50 @@ class TelegramForwarder:
             if input_chat:
                 input_peer = types.InputNotifyPeer(input_chat)
             else:
-                # 备选：从 chat_id 获取输入实体（可能仍会报错，但概率较低）
-                input_peer = types.InputNotifyPeer(await self.client.get_input_entity(event.chat_id))
+                # 备选：从 chat_id 获取输入实体（可能仍会报错，但概率较低），结果缓存复用
+                input_entity = self._input_peer_cache.get(chat_id)
+                if input_entity is None:
+                    input_entity = await self.client.get_input_entity(chat_id)
+                    self._input_peer_cache[chat_id] = input_entity
+                input_peer = types.InputNotifyPeer(input_entity)
 
             settings = await self.client(functions.account.GetNotifySettingsRequest(
                 peer=input_peer
             ))
 
-            mute_until = settings.mute_until
-
-            # 不免打扰
-            if not mute_until:
-                return False
-
-            # 兼容 datetime / int 两种情况
-            now = datetime.now(timezone.utc)
+            mute_until = self._to_epoch(settings.mute_until)
 
-            # 永久静音（int 版本）
-            if isinstance(mute_until, int):
-                # mute_until = 0 => 不免打扰
-                if mute_until == 0:
-                    return False
-                if mute_until == PERMANENT_MUTE:
-                    return True
-                return mute_until > int(time.time())
-
-            # datetime 版本
-            if isinstance(mute_until, datetime):
-                return mute_until > now
+            if mute_until == PERMANENT_MUTE:
+                # 永久静音
+                muted = True
+                expires_at = now + PERMANENT_MUTE_CACHE_TTL
+            elif mute_until > now:
+                # 定时静音，缓存到静音结束为止
+                muted = True
+                expires_at = min(mute_until, now + MUTE_CACHE_TTL)
+            else:
+                # 不免打扰
+                muted = False
+                expires_at = now + MUTE_CACHE_TTL
 
-            # 兜底使用免打扰策略
-            return True
+            self._mute_cache[chat_id] = (expires_at, muted)
+            return muted
         except Exception as e:
             logger.warning(f"检查静音状态失败: {e}")
             # 保守策略：异常时视为静音，避免误触发逻辑
             return True
 
+    async def _get_chat(self, event):
+        """获取对话实体：优先使用事件自带的实体和本地缓存，都没有时才请求"""
+        chat_id = event.chat_id
+        chat = event.chat
+        # min 实体信息不完整（如 left 不可靠），交由 get_chat() 重新获取
+        if chat is None or getattr(chat, 'min', False):
+            chat = self._chat_entity_cache.get(chat_id) or await event.get_chat()
+        if chat is not None and not getattr(chat, 'min', False):
+            self._chat_entity_cache[chat_id] = chat
+        return chat
+
     async def is_chat_joined(self, event) -> bool:
         """检查当前用户是否加入了该对话（群组/频道）
         
@@ -125,7 +227,7 @@ class TelegramForwarder:
         对于群组：检查用户是否是成员
         """
         try:
-            chat = await event.get_chat()
+            chat = await self._get_chat(event)
             
             # 私聊：直接返回 True
             if isinstance(chat, User):
@@ -169,17 +271,17 @@ class TelegramForwarder:
 
         chat_id = event.chat_id
 
-        # 检查是否加入了该群组（对于群组消息，只转发已加入的群组）
-        if not await self.is_chat_joined(event):
-            logger.debug(f"未加入对话 {chat_id}，跳过消息")
+        # 白名单检查（无需请求，优先判断）
+        if self.whitelist_chats and chat_id not in self._whitelist_ids:
             return False
 
-        # 白名单检查
-        if self.whitelist_chats and str(chat_id) not in self.whitelist_chats:
+        # 黑名单检查
+        if self.blacklist_chats and chat_id in self._blacklist_ids:
             return False
 
-        # 黑名单检查
-        if self.blacklist_chats and str(chat_id) in self.blacklist_chats:
+        # 检查是否加入了该群组（对于群组消息，只转发已加入的群组）
+        if not await self.is_chat_joined(event):
+            logger.debug(f"未加入对话 {chat_id}，跳过消息")
             return False
 
         # 静音检查
@@ -189,32 +291,51 @@ class TelegramForwarder:
 
         return True
 
+    @staticmethod
+    def _get_display_name(entity) -> Optional[str]:
+        """获取实体的显示名称：群组/频道取标题，用户取姓名"""
+        title = getattr(entity, 'title', None)
+        if title:
+            return title
+        name = " ".join(filter(None, (getattr(entity, 'first_name', None), getattr(entity, 'last_name', None))))
+        return name or None
+
     async def get_chat_title(self, event) -> str:
         """获取对话标题"""
+        chat_id = event.chat_id
+        title = self._chat_title_cache.get(chat_id)
+        if title:
+            return title
+
         try:
-            chat = await event.get_chat()
-            if isinstance(chat, Channel):
-                return chat.title
-            elif isinstance(chat, Chat):
-                return chat.title
-            elif isinstance(chat, User):
-                if chat.last_name:
-                    return f"{chat.first_name} {chat.last_name}"
-                return chat.first_name or "Unknown"
-            return "Unknown Chat"
+            chat = await self._get_chat(event)
+            title = self._get_display_name(chat)
+            if not title:
+                return "Unknown Chat"
+            self._chat_title_cache[chat_id] = title
+            return title
         except Exception as e:
             logger.warning(f"获取对话标题失败: {e}")
             return "Unknown"
 
     async def get_sender_name(self, event) -> str:
         """获取发送者名称"""
+        sender_id = event.sender_id
+        name = self._sender_name_cache.get(sender_id)
+        if name:
+            return name
+
         try:
-            sender = await event.get_sender()
-            if isinstance(sender, User):
-                if sender.last_name:
-                    return f"{sender.first_name} {sender.last_name}"
-                return sender.first_name or "Unknown User"
-            return "Unknown Sender"
+            # 优先使用事件自带的实体，避免请求
+            sender = event.sender
+            if sender is None or getattr(sender, 'min', False):
+                sender = await event.get_sender()
+            name = self._get_display_name(sender)
+            if not name:
+                return "Unknown Sender"
+            if sender_id is not None:
+                self._sender_name_cache[sender_id] = name
+            return name
         except Exception as e:
             logger.warning(f"获取发送者名称失败: {e}")
             return "Unknown"
@@ -240,39 +361,102 @@ class TelegramForwarder:
                 'message_id': event.message.id
             }
 
-            # 转发消息
-            success = await self.forwarder.send(forward_content)
-
-            if success:
-                logger.info(f"消息已转发 - [{chat_title}] {sender_name}: {message_text[:10]}")
-            else:
-                logger.error(f"消息转发失败 - [{chat_title}] {sender_name}")
+            # 放入发送队列，由后台任务转发，避免慢速 webhook 阻塞消息处理
+            try:
+                self._send_queue.put_nowait(forward_content)
+            except asyncio.QueueFull:
+                logger.warning(f"发送队列已满，丢弃消息 - [{chat_title}] {sender_name}")
 
         except Exception as e:
             logger.error(f"处理消息时出错: {e}", exc_info=True)
 
+    async def _send_worker(self):
+        """后台发送任务：从发送队列取出消息并转发"""
+        while True:
+            forward_content = await self._send_queue.get()
+            try:
+                await self._deliver(forward_content)
+            except Exception as e:
+                logger.error(f"转发消息时出错: {e}", exc_info=True)
+            finally:
+                self._send_queue.task_done()
+
+    async def _deliver(self, forward_content: dict):
+        """并发转发到所有转发器，并记录每个转发器的结果"""
+        results = await asyncio.gather(
+            *(forwarder.send(forward_content) for forwarder in self.forwarders),
+            return_exceptions=True
+        )
+
+        chat_title = forward_content['chat_title']
+        sender_name = forward_content['sender']
+        for forwarder_type, forwarder, result in zip(self.forwarder_types, self.forwarders, results):
+            if isinstance(result, Exception):
+                logger.error(f"消息转发出错 ({forwarder_type}) - [{chat_title}] {sender_name}: {result}")
+            elif result and forwarder.is_deferred:
+                # 合并发送的转发器在实际发送后记录结果
+                logger.debug(f"消息已加入合并队列 ({forwarder_type}) - [{chat_title}] {sender_name}")
+            elif result:
+                logger.info(f"消息已转发 ({forwarder_type}) - [{chat_title}] {sender_name}: {forward_content['message'][:10]}")
+            else:
+                logger.error(f"消息转发失败 ({forwarder_type}) - [{chat_title}] {sender_name}")
+
     async def start(self):
         """启动转发器"""
         logger.info("正在启动 Telegram 转发器...")
 
-        # 连接并登录
-        await self.client.start(phone=self.phone)
-        logger.info("已登录 Telegram")
-
-        # 注册消息处理器
-        @self.client.on(events.NewMessage())
-        async def handler(event):
-            await self.handle_new_message(event)
+        # 事件循环已启动，创建共享 HTTP 会话并注入转发器
+        self.session = create_session()
+        for forwarder in self.forwarders:
+            forwarder.session = self.session
 
-        logger.info("转发器已启动，等待新消息...")
-        logger.info(f"免打扰过滤: {'启用' if self.filter_muted else '禁用'}")
-        if self.whitelist_chats:
-            logger.info(f"白名单: {self.whitelist_chats}")
-        if self.blacklist_chats:
-            logger.info(f"黑名单: {self.blacklist_chats}")
-
-        # 保持运行
-        await self.client.run_until_disconnected()
+        try:
+            # 启动后台发送任务
+            for _ in range(self._send_workers):
+                self._background_tasks.append(asyncio.create_task(self._send_worker()))
+
+            # 连接并登录
+            await self.client.start(phone=self.phone)
+            logger.info("已登录 Telegram")
+
+            # 将黑白名单中的用户名解析为 chat_id，消息过滤时只需整数集合查找
+            self._whitelist_ids |= await self._resolve_usernames(self._whitelist_names)
+            self._blacklist_ids |= await self._resolve_usernames(self._blacklist_names)
+
+            # 预热转发器（如预先获取 access_token），避免首条消息等待
+            await asyncio.gather(*(forwarder.warmup() for forwarder in self.forwarders))
+
+            # 注册消息处理器
+            @self.client.on(events.NewMessage())
+            async def handler(event):
+                async with self._handler_semaphore:
+                    await self.handle_new_message(event)
+
+            logger.info("转发器已启动，等待新消息...")
+            logger.info(f"免打扰过滤: {'启用' if self.filter_muted else '禁用'}")
+            if self.whitelist_chats:
+                logger.info(f"白名单: {', '.join(self.whitelist_chats)}")
+            if self.blacklist_chats:
+                logger.info(f"黑名单: {', '.join(self.blacklist_chats)}")
+
+            # 保持运行
+            await self.client.run_until_disconnected()
+        finally:
+            await self._shutdown()
+
+    async def _shutdown(self):
+        """停止后台任务和转发器，最后关闭 HTTP 会话"""
+        pending = self._send_queue.qsize()
+        if pending:
+            logger.warning(f"发送队列中还有 {pending} 条消息未转发，将被丢弃")
+
+        for task in self._background_tasks:
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self._background_tasks.clear()
+
+        await asyncio.gather(*(forwarder.close() for forwarder in self.forwarders), return_exceptions=True)
+        await self.session.close()
 
 
 async def main():
@@ -288,4 +472,6 @@ async def main():
 
 
 if __name__ == '__main__':
+    if uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())